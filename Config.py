@@ -1,7 +1,11 @@
 import json
+
+DEFAULT_VAULTS = {"Default": "password_data.json"}
+
 class Config:
     def __init__(self, file_config: str):
         self._file_config = file_config
+        self._vaults = dict(DEFAULT_VAULTS)
         self._theme = self.read_config()
 
     @property
@@ -24,13 +28,32 @@ class Config:
         """Setter for theme"""
         self._theme = value
 
+    @property
+    def vaults(self):
+        """Getter for vaults (name -> data file)"""
+        return self._vaults
+
+    @vaults.setter
+    def vaults(self, value):
+        """Setter for vaults"""
+        self._vaults = value
+
     def read_config(self):
         """Reads config from file"""
         with open(self._file_config, "r") as file:
             config = json.loads(file.read())
             self._theme = config["theme"]
+            self._vaults = config.get("vaults") or dict(DEFAULT_VAULTS)
+
+    def _write_config(self):
+        """Writes config to file"""
+        with open(self._file_config, "w") as file:
+            file.write(json.dumps({"theme": self._theme, "vaults": self._vaults}, indent=4))
 
     def set_theme(self):
         """Setter for theme"""
-        with open(self._file_config, "w") as file:
-            file.write(json.dumps({"theme":self._theme}, indent=4))
+        self._write_config()
+
+    def set_vaults(self):
+        """Setter for vaults"""
+        self._write_config()
@@ -1,9 +1,24 @@
 import json
 import os
 import base64
+import hashlib
 import secrets
 import string
+import uuid
 from datetime import datetime
+
+# Campos de uma entrada que são compartilhados entre réplicas (o 'id' é local)
+ENTRY_FIELDS = ('uuid', 'site', 'email', 'password', 'notes', 'created_date', 'modified_date')
+DATE_FORMAT = "%d/%m/%Y %H:%M"
+MODIFIED_DATE_FORMAT = "%d/%m/%Y %H:%M:%S"
+
+
+def entry_hash(entry):
+    """Hash do conteúdo compartilhado de uma entrada"""
+    content = {field: entry.get(field, "") for field in ENTRY_FIELDS}
+    return hashlib.sha256(json.dumps(content, sort_keys=True).encode()).hexdigest()
+
+
 class DataManager:
     """Classe responsável pelo gerenciamento dos dados (CRUD operations)"""
 
@@ -16,6 +31,11 @@ class DataManager:
         """Adiciona um observador para mudanças nos dados"""
         self._observers.append(callback)
 
+    def remove_observer(self, callback):
+        """Remove um observador registrado"""
+        if callback in self._observers:
+            self._observers.remove(callback)
+
     def _notify_observers(self):
         """Notifica todos os observadores sobre mudanças"""
         for callback in self._observers:
@@ -47,6 +67,14 @@ class DataManager:
                         if 'notes' not in item:
                             item['notes'] = ""
 
+                        # UUID determinístico para entradas antigas, igual em todas as cópias do arquivo
+                        if 'uuid' not in item:
+                            item['uuid'] = self._legacy_uuid(item)
+
+                        # Hash da última versão sincronizada; entradas antigas partem do conteúdo atual
+                        if 'sync_hash' not in item:
+                            item['sync_hash'] = entry_hash(item)
+
                     # Salvar dados migrados
                     if data:
                         self._save_migrated_data(data)
@@ -86,6 +114,13 @@ class DataManager:
         except Exception as e:
             raise Exception(f"Error saving data: {e}")
 
+    @staticmethod
+    def _legacy_uuid(item):
+        """Deriva o UUID de uma entrada antiga a partir do ID e do site/email normalizados"""
+        name = "\n".join([str(item['id']), item['site'].strip().lower(),
+                          item['email'].strip().lower(), item['created_date']])
+        return uuid.uuid5(uuid.NAMESPACE_URL, name).hex
+
     def _generate_id(self):
         """Gera um ID único para nova entrada"""
         return max((entry.get('id', 0) for entry in self.data), default=0) + 1
@@ -117,13 +152,15 @@ class DataManager:
 
         new_entry = {
             'id': self._generate_id(),
+            'uuid': uuid.uuid4().hex,
             'site': site.strip(),
             'email': email.strip(),
             'password': password.strip(),
             'notes': notes.strip(),
-            'created_date': datetime.now().strftime("%d/%m/%Y %H:%M"),
-            'modified_date': datetime.now().strftime("%d/%m/%Y %H:%M")
+            'created_date': datetime.now().strftime(DATE_FORMAT),
+            'modified_date': datetime.now().strftime(MODIFIED_DATE_FORMAT)
         }
+        new_entry['sync_hash'] = entry_hash(new_entry)
 
         self.data.append(new_entry)
         self._save_data()
@@ -152,7 +189,7 @@ class DataManager:
             'email': email.strip(),
             'password': password.strip(),
             'notes': kwargs.get('notes', entry['notes']).strip(),
-            'modified_date': datetime.now().strftime("%d/%m/%Y %H:%M")
+            'modified_date': datetime.now().strftime(MODIFIED_DATE_FORMAT)
         })
 
         self._save_data()
@@ -177,6 +214,62 @@ class DataManager:
                 return entry
         return None
 
+    def find_by_uuid(self, entry_uuid):
+        """Busca entrada pelo UUID compartilhado entre réplicas"""
+        for entry in self.data:
+            if entry.get('uuid') == entry_uuid:
+                return entry
+        return None
+
+    def find_by_key(self, site, email):
+        """Busca entrada pela combinação normalizada site/email"""
+        for entry in self.data:
+            if (entry['site'].strip().lower() == site.strip().lower() and
+                    entry['email'].strip().lower() == email.strip().lower()):
+                return entry
+        return None
+
+    def _find_merge_target(self, remote):
+        """Entrada local que uma entrada remota substitui: mesmo UUID ou, na falta dele, mesmo site/email"""
+        return self.find_by_uuid(remote['uuid']) or self.find_by_key(remote['site'], remote['email'])
+
+    def merge_entries(self, entries):
+        """Insere ou substitui entradas vindas de outra réplica (usado pela sincronização)"""
+        if not entries:
+            return 0
+
+        # Validar tudo antes de alterar qualquer dado
+        for remote in entries:
+            if not remote.get('uuid'):
+                raise ValueError("Entry UUID is required!")
+            self._validate_entry(remote.get('site'), remote.get('email'), remote.get('password'))
+            target = self._find_merge_target(remote)
+            if self._entry_exists(remote['site'], remote['email'], target and target.get('id')):
+                raise ValueError("This site and email combination already exists!")
+
+        for remote in entries:
+            fields = {key: remote.get(key, "") for key in ENTRY_FIELDS}
+            fields['sync_hash'] = entry_hash(fields)
+            entry = self._find_merge_target(remote)
+            if entry:
+                # Mantém o ID local, que só é único dentro deste arquivo
+                entry.update(fields)
+            else:
+                fields['id'] = self._generate_id()
+                self.data.append(fields)
+
+        self._save_data()
+        self._notify_observers()
+        return len(entries)
+
+    def mark_synced(self, uuids):
+        """Registra o conteúdo atual das entradas como a última versão sincronizada"""
+        wanted = set(uuids)
+        for entry in self.data:
+            if entry.get('uuid') in wanted:
+                entry['sync_hash'] = entry_hash(entry)
+        self._save_data()
+
     def filter_entries(self, search_term=""):
         """Filtra entradas por termo de busca"""
         if not search_term:
@@ -1,9 +1,13 @@
+import queue
 import tkinter as tk
-from tkinter import ttk, messagebox, simpledialog
+from tkinter import ttk, messagebox, simpledialog, filedialog
 from ttkthemes import ThemedTk, ThemedStyle
-from DataManager import DataManager
+from VaultRegistry import VaultRegistry
 from Config import Config
 
+IDLE_CHECK_MS = 60000  # Intervalo para descarregar cofres ociosos
+SEARCH_POLL_MS = 50  # Intervalo para buscar resultados da busca federada
+
 class PasswordManagerGUI:
     """Classe responsável pela interface gráfica com suporte a temas"""
 
@@ -26,13 +30,74 @@ class PasswordManagerGUI:
         else:
             self.style = None
 
-        # Instanciar gerenciador de dados e se registrar como observador
-        self.manager = DataManager()
+        # Registro de cofres; o cofre ativo é observado pela interface
+        self.vaults = VaultRegistry(self.config.vaults)
+        self.manager = self.vaults.manager
         self.manager.add_observer(self._update_list)
 
         self.selected_entry_id = None
+        self.selected_entry_vault = None
+        self._row_entries = {}  # item do treeview -> (cofre, ID)
+        self._search_generation = 0  # Descarta resultados de buscas federadas antigas
+        self._pending_search = {}
+        self._search_results = queue.Queue()
         self._create_interface()
         self._update_list()
+        self.root.after(IDLE_CHECK_MS, self._unload_idle_vaults)
+        self.root.after(SEARCH_POLL_MS, self._drain_search_results)
+        self.root.protocol("WM_DELETE_WINDOW", self._on_close)
+
+    def _on_close(self):
+        """Encerra o pool de busca antes de fechar a janela"""
+        self.vaults.close()
+        self.root.destroy()
+
+    def _switch_vault(self, name):
+        """Troca o cofre ativo sem reler cofres já carregados"""
+        if name == self.vaults.active:
+            return
+        try:
+            manager = self.vaults.switch(name)
+        except ValueError as e:
+            messagebox.showwarning("⚠️ Warning", str(e))
+            self.vault_var.set(self.vaults.active)
+            return
+
+        self.manager.remove_observer(self._update_list)
+        self.manager = manager
+        self.manager.add_observer(self._update_list)
+        self.vault_var.set(name)
+        self._clear_fields()
+        # Na busca federada as linhas exibidas não dependem do cofre ativo
+        if not self.search_all_var.get():
+            self._update_list()
+
+    def _add_vault(self):
+        """Registra um novo cofre e o torna ativo"""
+        name = simpledialog.askstring("🗄️ Add Vault", "Vault name:")
+        if not name:
+            return
+        data_file = filedialog.asksaveasfilename(title="Vault file", defaultextension=".json",
+                                                 filetypes=[("JSON files", "*.json")],
+                                                 confirmoverwrite=False)
+        if not data_file:
+            return
+
+        try:
+            self.vaults.register(name, data_file)
+        except ValueError as e:
+            messagebox.showwarning("⚠️ Warning", str(e))
+            return
+
+        self.config.vaults[name] = data_file
+        self.config.set_vaults()
+        self.vault_combo.config(values=self.vaults.names())
+        self._switch_vault(name)
+
+    def _unload_idle_vaults(self):
+        """Descarrega periodicamente os cofres ociosos para limitar o uso de memória"""
+        self.vaults.unload_idle()
+        self.root.after(IDLE_CHECK_MS, self._unload_idle_vaults)
 
     def change_theme(self, theme_name):
         """Muda o tema da aplicação"""
@@ -85,9 +150,25 @@ class PasswordManagerGUI:
         ttk.Label(header_frame, text="Email and Password Manager",
                   font=("Arial", 16, "bold")).grid(row=0, column=0, sticky=tk.W)
 
+        # Frame para seletor de cofre
+        vault_frame = ttk.Frame(header_frame)
+        vault_frame.grid(row=0, column=1, sticky=tk.E)
+
+        ttk.Label(vault_frame, text="Vault:").grid(row=0, column=0, padx=(0, 5))
+
+        self.vault_var = tk.StringVar(value=self.vaults.active)
+        self.vault_combo = ttk.Combobox(vault_frame, textvariable=self.vault_var,
+                                        values=self.vaults.names(),
+                                        state="readonly", width=15)
+        self.vault_combo.grid(row=0, column=1, padx=(0, 5))
+        self.vault_combo.bind("<<ComboboxSelected>>", lambda e: self._switch_vault(self.vault_var.get()))
+
+        ttk.Button(vault_frame, text="+", width=3,
+                   command=self._add_vault).grid(row=0, column=2, padx=(0, 10))
+
         # Frame para seletor de tema
         theme_frame = ttk.Frame(header_frame)
-        theme_frame.grid(row=0, column=1, sticky=tk.E)
+        theme_frame.grid(row=0, column=2, sticky=tk.E)
 
         ttk.Label(theme_frame, text="Theme:").grid(row=0, column=0, padx=(0, 5))
 
@@ -110,6 +191,7 @@ class PasswordManagerGUI:
         # Configurar peso das colunas do header
         header_frame.columnconfigure(0, weight=1)
         header_frame.columnconfigure(1, weight=0)
+        header_frame.columnconfigure(2, weight=0)
 
     def _create_entry_frame(self, parent):
         """Cria o frame de entrada de dados"""
@@ -204,6 +286,11 @@ class PasswordManagerGUI:
                                       command=lambda: self.search_var.set(""))
         clear_search_btn.grid(row=0, column=2, padx=5)
 
+        # Busca federada em todos os cofres
+        self.search_all_var = tk.BooleanVar(value=False)
+        ttk.Checkbutton(search_frame, text="All vaults", variable=self.search_all_var,
+                        command=self._update_list).grid(row=0, column=3, padx=5)
+
         search_frame.columnconfigure(1, weight=1)
 
     def _create_treeview(self, parent):
@@ -212,7 +299,7 @@ class PasswordManagerGUI:
         tree_frame = ttk.Frame(parent)
         tree_frame.grid(row=1, column=0, columnspan=2, sticky=(tk.W, tk.E, tk.N, tk.S), pady=(0, 10))
 
-        columns = ("ID", "Site", "Email", "Password", "Notes", "Created Date")
+        columns = ("ID", "Site", "Email", "Password", "Notes", "Created Date", "Vault")
         self.tree = ttk.Treeview(tree_frame, columns=columns, show="headings", height=12)
 
         # Configurar colunas com melhor layout
@@ -222,7 +309,8 @@ class PasswordManagerGUI:
             "Email": (200, tk.W),
             "Password": (100, tk.CENTER),
             "Notes": (150, tk.W),
-            "Created Date": (120, tk.CENTER)
+            "Created Date": (120, tk.CENTER),
+            "Vault": (100, tk.W)
         }
 
         for col in columns:
@@ -281,11 +369,18 @@ class PasswordManagerGUI:
         main_frame.columnconfigure(0, weight=1)
         main_frame.rowconfigure(2, weight=1)
 
-    def _get_selected_entry_id(self):
-        """Obtém o ID da entrada selecionada na lista"""
+    def _get_selected_entry(self):
+        """Obtém o cofre e o ID da entrada selecionada na lista"""
         selection = self.tree.selection()
         if selection:
-            return self.tree.item(selection[0])['values'][0]
+            return self._row_entries.get(selection[0], (None, None))
+        return None, None
+
+    def _find_selected_entry(self):
+        """Busca a entrada selecionada no seu cofre, sem mudar o cofre ativo"""
+        vault, entry_id = self._get_selected_entry()
+        if entry_id:
+            return self.vaults.get(vault).find_by_id(entry_id)
         return None
 
     def _execute_operation(self, operation, success_message, **kwargs):
@@ -320,7 +415,7 @@ class PasswordManagerGUI:
             return
 
         self._execute_operation(
-            self.manager.update_entry,
+            self.vaults.get(self.selected_entry_vault).update_entry,
             "Entry updated successfully!",
             entry_id=self.selected_entry_id,
             site=self.site_var.get(),
@@ -328,33 +423,44 @@ class PasswordManagerGUI:
             password=self.password_var.get(),
             notes=self.notes_var.get()
         )
+        vault = self.selected_entry_vault
         self._clear_fields()
+        self._refresh_other_vault(vault)
+
+    def _refresh_other_vault(self, vault):
+        """Atualiza a lista após mudar um cofre que não é o ativo (e não é observado)"""
+        if vault != self.vaults.active:
+            self._update_list()
 
     def _delete_entry(self):
         """Deleta entrada selecionada"""
-        entry_id = self._get_selected_entry_id()
+        vault, entry_id = self._get_selected_entry()
         if not entry_id:
             messagebox.showwarning("⚠️ Warning", "Select an entry to delete!")
             return
 
-        if messagebox.askyesno("🗑️ Confirm Delete", f"Delete entry ID {entry_id}?\n\nThis action cannot be undone."):
+        if messagebox.askyesno("🗑️ Confirm Delete",
+                               f"Delete entry ID {entry_id} from vault '{vault}'?\n\nThis action cannot be undone."):
             self._execute_operation(
-                self.manager.delete_entry,
+                self.vaults.get(vault).delete_entry,
                 "Entry deleted successfully!",
                 entry_id=entry_id
             )
             self._clear_fields()
+            self._refresh_other_vault(vault)
 
     def _edit_entry(self):
         """Carrega dados da entrada selecionada para edição"""
-        entry_id = self._get_selected_entry_id()
+        vault, entry_id = self._get_selected_entry()
         if not entry_id:
             messagebox.showwarning("⚠️ Warning", "Select an entry to edit!")
             return
 
-        entry = self.manager.find_by_id(entry_id)
+        # A edição acontece no cofre de origem da entrada, sem mudar o cofre ativo
+        entry = self.vaults.get(vault).find_by_id(entry_id)
         if entry:
             self.selected_entry_id = entry_id
+            self.selected_entry_vault = vault
             self.site_var.set(entry['site'])
             self.email_var.set(entry['email'])
             self.password_var.set(entry['password'])
@@ -380,27 +486,24 @@ class PasswordManagerGUI:
 
     def _copy_password(self):
         """Copia senha para área de transferência"""
-        entry_id = self._get_selected_entry_id()
-        if entry_id:
-            entry = self.manager.find_by_id(entry_id)
-            if entry:
-                self.root.clipboard_clear()
-                self.root.clipboard_append(entry['password'])
-                messagebox.showinfo("📋 Success", "Password copied to clipboard!")
+        entry = self._find_selected_entry()
+        if entry:
+            self.root.clipboard_clear()
+            self.root.clipboard_append(entry['password'])
+            messagebox.showinfo("📋 Success", "Password copied to clipboard!")
 
     def _show_password(self):
         """Mostra senha em popup"""
-        entry_id = self._get_selected_entry_id()
-        if entry_id:
-            entry = self.manager.find_by_id(entry_id)
-            if entry:
-                messagebox.showinfo("👁️ Password", f"Password for {entry['site']}:\n\n{entry['password']}")
+        entry = self._find_selected_entry()
+        if entry:
+            messagebox.showinfo("👁️ Password", f"Password for {entry['site']}:\n\n{entry['password']}")
 
     def _clear_fields(self):
         """Limpa todos os campos de entrada"""
         for var in [self.site_var, self.email_var, self.password_var, self.notes_var]:
             var.set("")
         self.selected_entry_id = None
+        self.selected_entry_vault = None
         self.entry_buttons['add'].config(state="normal")
         self.entry_buttons['update'].config(state="disabled")
 
@@ -409,12 +512,40 @@ class PasswordManagerGUI:
         # Limpar lista atual
         for item in self.tree.get_children():
             self.tree.delete(item)
+        self._row_entries = {}
+
+        # Uma nova busca invalida a anterior, mesmo que ainda esteja em andamento
+        self._search_generation += 1
+        for future in self._pending_search:
+            future.cancel()
+        self._pending_search = {}
+
+        # Obter dados filtrados (do cofre ativo ou de todos os cofres)
+        if self.search_all_var.get():
+            generation = self._search_generation
+            # As threads do pool só enfileiram; _drain_search_results altera a lista na thread do Tk
+            self._pending_search = self.vaults.search_async(
+                self.search_var.get(),
+                lambda name, rows: self._search_results.put((generation, rows)))
+        else:
+            self._insert_rows([dict(entry, vault=self.vaults.active)
+                               for entry in self.manager.filter_entries(self.search_var.get())])
 
-        # Obter dados filtrados
-        entries = self.manager.filter_entries(self.search_var.get())
-
+    def _drain_search_results(self):
+        """Adiciona à lista os resultados já recebidos da busca federada, se ainda forem atuais"""
+        while True:
+            try:
+                generation, rows = self._search_results.get_nowait()
+            except queue.Empty:
+                break
+            if generation == self._search_generation:
+                self._insert_rows(rows)
+        self.root.after(SEARCH_POLL_MS, self._drain_search_results)
+
+    def _insert_rows(self, entries):
+        """Insere entradas no fim da lista"""
         # Adicionar entradas à lista com cores alternadas
-        for i, entry in enumerate(entries):
+        for i, entry in enumerate(entries, start=len(self.tree.get_children())):
             # Verificar se todos os campos necessários existem
             entry_id = entry.get('id', 'N/A')
             site = entry.get('site', 'N/A')
@@ -422,13 +553,16 @@ class PasswordManagerGUI:
             password = entry.get('password', '')
             notes = entry.get('notes', '')
             created_date = entry.get('created_date', entry.get('data', 'N/A'))
+            vault = entry.get('vault', '')
 
             masked_password = "•" * min(len(password), 8) if password else ""
 
             # Inserir item com tag para cores alternadas
             item = self.tree.insert("", "end", values=(
-                entry_id, site, email, masked_password, notes, created_date
+                entry_id, site, email, masked_password, notes, created_date, vault
             ), tags=('evenrow' if i % 2 == 0 else 'oddrow',))
+            # Tk converte valores numéricos das células; a origem fica guardada à parte
+            self._row_entries[item] = (vault, entry_id)
 
         # Configurar tags de cores (se suportado pelo tema)
         try:
@@ -0,0 +1,165 @@
+import os
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from DataManager import DataManager
+
+
+class VaultRegistry:
+    """Registro de cofres: cada cofre tem seu próprio DataManager, carregado sob demanda"""
+
+    def __init__(self, vaults=None, idle_timeout=600, max_workers=4):
+        self.idle_timeout = idle_timeout  # Segundos sem uso até descarregar
+        self.max_workers = max_workers
+        self.active = None
+        self._files = {}        # nome -> arquivo de dados
+        self._managers = {}     # nome -> DataManager carregado
+        self._last_used = {}    # nome -> último acesso (time.monotonic)
+        self._locks = {}        # nome -> lock de carregamento
+        self._lock = threading.Lock()
+        self._executor = None
+
+        for name, data_file in (vaults or {}).items():
+            self.register(name, data_file)
+
+    def register(self, name, data_file):
+        """Registra um cofre sem carregá-lo"""
+        if not name or not name.strip():
+            raise ValueError("Vault name is required!")
+        with self._lock:
+            if name in self._files:
+                raise ValueError("This vault name already exists!")
+            # Dois DataManagers no mesmo arquivo sobrescreveriam os dados um do outro
+            path = os.path.abspath(data_file)
+            if any(os.path.abspath(registered) == path for registered in self._files.values()):
+                raise ValueError("This data file is already used by another vault!")
+            self._files[name] = data_file
+            self._locks[name] = threading.Lock()
+            if self.active is None:
+                self.active = name
+
+    def unregister(self, name):
+        """Remove um cofre do registro (o arquivo não é apagado)"""
+        if name == self.active:
+            raise ValueError("Cannot remove the active vault!")
+        with self._lock:
+            self._check_exists(name)
+            for mapping in (self._files, self._managers, self._last_used, self._locks):
+                mapping.pop(name, None)
+
+    def _check_exists(self, name):
+        """Valida se o cofre está registrado"""
+        if name not in self._files:
+            raise ValueError(f"Vault not found: {name}")
+
+    def names(self):
+        """Nomes dos cofres na ordem de registro"""
+        return list(self._files)
+
+    def data_file(self, name):
+        """Arquivo de dados de um cofre"""
+        self._check_exists(name)
+        return self._files[name]
+
+    def is_loaded(self, name):
+        """Indica se o cofre está carregado em memória"""
+        return name in self._managers
+
+    def get(self, name):
+        """Retorna o DataManager do cofre, carregando-o se necessário"""
+        self._check_exists(name)
+        # Lock por cofre: cofres diferentes podem carregar em paralelo
+        with self._locks[name]:
+            manager = self._managers.get(name)
+            if manager is None:
+                manager = DataManager(self._files[name])
+                self._managers[name] = manager
+            self._last_used[name] = time.monotonic()
+        return manager
+
+    @property
+    def manager(self):
+        """DataManager do cofre ativo"""
+        if self.active is None:
+            raise ValueError("No vault registered!")
+        return self.get(self.active)
+
+    def switch(self, name):
+        """Torna outro cofre o ativo; cofres já carregados não são relidos"""
+        manager = self.get(name)
+        self.active = name
+        return manager
+
+    def unload(self, name):
+        """Descarrega um cofre da memória (ele volta a ser lido no próximo acesso)"""
+        if name == self.active:
+            raise ValueError("Cannot unload the active vault!")
+        self._check_exists(name)
+        with self._locks[name]:
+            self._managers.pop(name, None)
+            self._last_used.pop(name, None)
+
+    def unload_idle(self, max_idle=None):
+        """Descarrega cofres sem uso há mais de `max_idle` segundos e retorna seus nomes"""
+        max_idle = self.idle_timeout if max_idle is None else max_idle
+        now = time.monotonic()
+        idle = [name for name, last_used in list(self._last_used.items())
+                if name != self.active and now - last_used > max_idle]
+        for name in idle:
+            self.unload(name)
+        return idle
+
+    def search(self, search_term="", on_result=None):
+        """Executa filter_entries em todos os cofres em paralelo e aguarda o resultado
+
+        Cada linha retornada é uma cópia marcada com a chave 'vault'.
+        `on_result(name, rows)` é chamado à medida que cada cofre responde;
+        o resultado final segue a ordem de registro dos cofres.
+        """
+        futures = self.search_async(search_term)
+        results = {}
+        for future in as_completed(futures):
+            name = futures[future]
+            results[name] = future.result()
+            if on_result:
+                on_result(name, results[name])
+
+        return [row for name in self.names() if name in results for row in results[name]]
+
+    def search_async(self, search_term="", on_result=None):
+        """Dispara a busca em todos os cofres sem bloquear
+
+        `on_result(name, rows)` é chamado na thread do pool assim que cada
+        cofre responde. Retorna {future: nome} para aguardar ou cancelar.
+        """
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self.max_workers,
+                                                thread_name_prefix="vault-search")
+
+        def notify(future):
+            name = futures[future]
+            if future.cancelled():
+                return
+            if future.exception():
+                print(f"Error searching vault {name}: {future.exception()}")
+                on_result(name, [])
+            else:
+                on_result(name, future.result())
+
+        futures = {}
+        for name in self.names():
+            future = self._executor.submit(self._search_vault, name, search_term)
+            futures[future] = name
+            if on_result:
+                future.add_done_callback(notify)
+        return futures
+
+    def _search_vault(self, name, search_term):
+        """Busca em um único cofre, marcando cada linha com sua origem"""
+        return [dict(entry, vault=name) for entry in self.get(name).filter_entries(search_term)]
+
+    def close(self):
+        """Encerra o pool de threads da busca"""
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+            self._executor = None
@@ -0,0 +1,412 @@
+import json
+import hmac
+import socket
+import secrets
+import hashlib
+from datetime import datetime
+from DataManager import DataManager, ENTRY_FIELDS, DATE_FORMAT, MODIFIED_DATE_FORMAT, entry_hash
+
+HEX_DIGITS = "0123456789abcdef"
+DATE_FORMATS = (MODIFIED_DATE_FORMAT, DATE_FORMAT, "%d/%m/%Y")
+
+
+def entry_key(entry):
+    """Chave de sincronização: UUID da entrada, estável mesmo se site/email mudarem"""
+    return entry['uuid']
+
+
+def parse_date(value):
+    """Converte modified_date para datetime (aceita formatos com e sem hora)"""
+    for date_format in DATE_FORMATS:
+        try:
+            return datetime.strptime(value, date_format)
+        except (TypeError, ValueError):
+            continue
+    return datetime.min
+
+
+def changed_since_sync(entry):
+    """Indica se a entrada mudou desde a última versão sincronizada"""
+    return entry.get('sync_hash') != entry_hash(entry)
+
+
+def sign_challenge(secret, role, challenge):
+    """Resposta HMAC do desafio de autenticação ("client" ou "server", para não ser refletida)"""
+    return hmac.new(secret.encode(), f"{role}:{challenge}".encode(), hashlib.sha256).hexdigest()
+
+
+class MerkleTree:
+    """Árvore de Merkle de profundidade fixa sobre os hashes das entradas
+
+    Cada entrada cai no bucket dado pelos primeiros `depth` dígitos hex do
+    hash da sua chave, então duas réplicas sempre têm a mesma forma de
+    árvore e podem comparar nó a nó.
+    """
+
+    def __init__(self, entries, depth=4):
+        self.depth = depth
+        self._buckets = {}
+        self._nodes = {}
+
+        for entry in entries:
+            key = entry_key(entry)
+            prefix = hashlib.sha256(key.encode()).hexdigest()[:depth]
+            self._buckets.setdefault(prefix, {})[key] = entry_hash(entry)
+
+        # Folhas
+        for prefix, bucket in self._buckets.items():
+            lines = "".join(f"{key}\t{value}\n" for key, value in sorted(bucket.items()))
+            self._nodes[prefix] = hashlib.sha256(lines.encode()).hexdigest()
+
+        # Nós internos, de baixo para cima (apenas os não vazios)
+        level = set(self._buckets)
+        for _ in range(depth):
+            parents = {prefix[:-1] for prefix in level}
+            for parent in parents:
+                children = "".join(f"{digit}{self._nodes.get(parent + digit, '')}"
+                                   for digit in HEX_DIGITS)
+                self._nodes[parent] = hashlib.sha256(children.encode()).hexdigest()
+            level = parents
+
+    def root(self):
+        """Hash da raiz ("" para um cofre vazio)"""
+        return self._nodes.get("", "")
+
+    def children(self, prefix):
+        """Hashes dos filhos não vazios de um nó interno"""
+        return {prefix + digit: self._nodes[prefix + digit]
+                for digit in HEX_DIGITS if prefix + digit in self._nodes}
+
+    def bucket(self, prefix):
+        """Hashes das entradas de um bucket folha, por chave"""
+        return dict(self._buckets.get(prefix, {}))
+
+
+class VaultSync:
+    """Sincroniza réplicas de um cofre trocando apenas os nós da árvore que diferem
+
+    A própria instância serve de peer local; para outro processo, use
+    `serve()` de um lado e `StreamPeer` do outro, com o mesmo segredo.
+    Chame `close()` ao terminar para desligar a instância do DataManager.
+    """
+
+    PEER_OPERATIONS = ('info', 'children', 'bucket', 'records', 'merge', 'mark_synced')
+
+    def __init__(self, manager, depth=4):
+        self.manager = manager
+        self.depth = depth
+        self._tree = None
+        self.manager.add_observer(self._invalidate)
+
+    def close(self):
+        """Remove o observador registrado no DataManager"""
+        self.manager.remove_observer(self._invalidate)
+
+    def _invalidate(self):
+        """Descarta a árvore em cache quando os dados mudam"""
+        self._tree = None
+
+    @property
+    def tree(self):
+        """Árvore de Merkle do cofre, reconstruída apenas após mudanças"""
+        if self._tree is None:
+            self._tree = MerkleTree(self.manager.get_all_entries(), self.depth)
+        return self._tree
+
+    # Operações de peer
+
+    def info(self):
+        """Profundidade e hash da raiz"""
+        return {'depth': self.depth, 'root': self.tree.root()}
+
+    def children(self, prefix):
+        """Hashes dos filhos de um nó"""
+        return self.tree.children(prefix)
+
+    def bucket(self, prefix):
+        """Hashes das entradas de um bucket"""
+        return self.tree.bucket(prefix)
+
+    def records(self, keys):
+        """Retorna as entradas com as chaves pedidas"""
+        wanted = set(keys)
+        return [{field: entry.get(field, "") for field in ENTRY_FIELDS + ('sync_hash',)}
+                for entry in self.manager.get_all_entries() if entry_key(entry) in wanted]
+
+    def mark_synced(self, keys):
+        """Registra as entradas como sincronizadas na versão atual"""
+        self.manager.mark_synced(keys)
+
+    def merge(self, records):
+        """Aplica entradas remotas com last-writer-wins e retorna os conflitos"""
+        accepted = []
+        conflicts = []
+        for remote in records:
+            local = self.manager.find_by_uuid(remote['uuid'])
+            other = self.manager.find_by_key(remote['site'], remote['email'])
+            if local is not None and other is not None and other is not local:
+                # Renomeada para o site/email de outra entrada: precisa de revisão manual
+                conflicts.append(self._conflict(other, remote, resolved=False))
+                continue
+
+            # Sem o mesmo UUID, a entrada com o mesmo site/email foi criada em paralelo
+            created_in_parallel = local is None and other is not None
+            local = local or other
+            winner, conflict = self._resolve(local, remote)
+            if winner == "remote":
+                accepted.append(remote)
+            if (conflict or created_in_parallel) and winner != "same":
+                conflicts.append(self._conflict(local, remote, resolved=True))
+
+        self.manager.merge_entries(accepted)
+        return conflicts
+
+    @staticmethod
+    def _conflict(local, remote, resolved):
+        """Descrição de um conflito para revisão"""
+        return {'key': entry_key(remote), 'local': dict(local), 'remote': dict(remote),
+                'resolved': resolved}
+
+    @staticmethod
+    def _resolve(local, remote):
+        """Decide qual versão vence ("local", "remote" ou "same") e se houve conflito
+
+        Há conflito quando os dois lados mudaram desde a última sincronização
+        ou quando as datas empatam. Vence a data mais recente; empates são
+        desfeitos pelo maior hash de conteúdo, então as duas réplicas
+        escolhem a mesma versão.
+        """
+        if local is None:
+            return "remote", False
+        if remote is None:
+            return "local", False
+
+        local_hash, remote_hash = entry_hash(local), entry_hash(remote)
+        if local_hash == remote_hash:
+            return "same", False
+
+        concurrent = changed_since_sync(local) and changed_since_sync(remote)
+        local_date = parse_date(local.get('modified_date'))
+        remote_date = parse_date(remote.get('modified_date'))
+        if remote_date != local_date:
+            return ("remote" if remote_date > local_date else "local"), concurrent
+        return ("remote" if remote_hash > local_hash else "local"), True
+
+    # Sincronização
+
+    def diff(self, peer):
+        """Percorre as duas árvores e retorna as chaves cujo conteúdo difere"""
+        remote_info = peer.info()
+        if remote_info['depth'] != self.depth:
+            raise ValueError("Replicas use different tree depths!")
+        if remote_info['root'] == self.tree.root():
+            return set()
+
+        keys = set()
+        pending = [""]
+        while pending:
+            prefix = pending.pop()
+            if len(prefix) == self.depth:
+                local, remote = self.bucket(prefix), peer.bucket(prefix)
+                keys.update(key for key in set(local) | set(remote)
+                            if local.get(key) != remote.get(key))
+            else:
+                local, remote = self.children(prefix), peer.children(prefix)
+                pending.extend(child for child in set(local) | set(remote)
+                               if local.get(child) != remote.get(child))
+        return keys
+
+    def sync(self, peer):
+        """Sincroniza nos dois sentidos com o peer e retorna um resumo
+
+        Exclusões não são propagadas: uma entrada apagada de um lado
+        volta a partir da outra réplica.
+        """
+        keys = self.diff(peer)
+        report = {'pulled': 0, 'pushed': 0, 'conflicts': []}
+        if not keys:
+            return report
+
+        remote_records = {entry_key(record): record for record in peer.records(keys)}
+        local_records = {entry_key(record): record for record in self.records(keys)}
+
+        to_pull = []
+        to_push = []
+        for key in keys:
+            local, remote = local_records.get(key), remote_records.get(key)
+            winner, conflict = self._resolve(local, remote)
+            if winner == "remote":
+                to_pull.append(remote)
+            elif winner == "local":
+                to_push.append(local)
+            if conflict:
+                report['conflicts'].append(self._conflict(local, remote, resolved=True))
+
+        # Entradas criadas em paralelo aparecem nos dois lados; reportar cada par uma vez
+        conflicts = report['conflicts'] + self.merge(to_pull) + peer.merge(to_push)
+        self.mark_synced(keys)
+        peer.mark_synced(keys)
+        seen = set()
+        report['conflicts'] = []
+        for conflict in conflicts:
+            pair = frozenset((conflict['local']['uuid'], conflict['remote']['uuid']))
+            if pair not in seen:
+                seen.add(pair)
+                report['conflicts'].append(conflict)
+        report['pulled'] = len(to_pull)
+        report['pushed'] = len(to_push)
+        return report
+
+    def serve(self, reader, writer, secret):
+        """Atende requisições de um StreamPeer (uma mensagem JSON por linha) até EOF
+
+        O cliente precisa provar que conhece `secret` antes de qualquer operação,
+        e este lado responde ao desafio do cliente. Mensagens de autenticação
+        malformadas são recusadas; retorna False se a autenticação falhar.
+        """
+        if not secret:
+            raise ValueError("Sync secret is required!")
+
+        challenge = secrets.token_hex(16)
+        self._send(writer, {'challenge': challenge})
+        try:
+            request = json.loads(reader.readline() or "{}")
+        except ValueError:
+            request = None
+        args = request.get('args') if isinstance(request, dict) else None
+        valid = (isinstance(args, list) and request.get('op') == 'auth'
+                 and len(args) == 2 and all(isinstance(arg, str) for arg in args))
+        if not valid or not hmac.compare_digest(
+                args[0].encode(), sign_challenge(secret, "client", challenge).encode()):
+            self._send(writer, {'error': "Authentication failed!"})
+            return False
+        # Prova ao cliente que este lado também conhece o segredo
+        self._send(writer, {'result': sign_challenge(secret, "server", args[1])})
+
+        for line in reader:
+            if not line.strip():
+                continue
+            try:
+                request = json.loads(line)
+                if request.get('op') not in self.PEER_OPERATIONS:
+                    raise ValueError(f"Unknown operation: {request.get('op')}")
+                args = request.get('args', [])
+                if request['op'] == 'records':
+                    args = [set(args[0])]
+                response = {'result': getattr(self, request['op'])(*args)}
+            except Exception as e:
+                response = {'error': str(e)}
+            self._send(writer, response)
+        return True
+
+    @staticmethod
+    def _send(writer, message):
+        """Escreve uma mensagem JSON em uma linha"""
+        writer.write(json.dumps(message) + "\n")
+        writer.flush()
+
+
+class StreamPeer:
+    """Peer remoto acessado por um par de streams de texto (pipe ou socket)"""
+
+    def __init__(self, reader, writer, secret):
+        if not secret:
+            raise ValueError("Sync secret is required!")
+        self._reader = reader
+        self._writer = writer
+        self._authenticate(secret)
+
+    @classmethod
+    def from_socket(cls, sock, secret):
+        """Cria um peer a partir de um socket conectado"""
+        stream = sock.makefile("rw", encoding="utf-8")
+        return cls(stream, stream, secret)
+
+    def _authenticate(self, secret):
+        """Responde ao desafio do serve() e exige que ele responda ao nosso
+
+        Nenhuma entrada é enviada ou aceita antes de o servidor provar que
+        conhece o segredo.
+        """
+        line = self._reader.readline()
+        if not line:
+            raise ConnectionError("Peer closed the connection!")
+        challenge = json.loads(line)['challenge']
+        own_challenge = secrets.token_hex(16)
+        proof = self._call('auth', sign_challenge(secret, "client", challenge), own_challenge)
+        if not isinstance(proof, str) or not hmac.compare_digest(
+                proof.encode(), sign_challenge(secret, "server", own_challenge).encode()):
+            raise PermissionError("Peer failed authentication!")
+
+    def _call(self, op, *args):
+        """Envia uma requisição e aguarda a resposta"""
+        self._writer.write(json.dumps({'op': op, 'args': list(args)}) + "\n")
+        self._writer.flush()
+        line = self._reader.readline()
+        if not line:
+            raise ConnectionError("Peer closed the connection!")
+        response = json.loads(line)
+        if 'error' in response:
+            raise Exception(f"Peer error: {response['error']}")
+        return response['result']
+
+    def info(self):
+        return self._call('info')
+
+    def children(self, prefix):
+        return self._call('children', prefix)
+
+    def bucket(self, prefix):
+        return self._call('bucket', prefix)
+
+    def records(self, keys):
+        return self._call('records', sorted(keys))
+
+    def merge(self, records):
+        return self._call('merge', records)
+
+    def mark_synced(self, keys):
+        return self._call('mark_synced', sorted(keys))
+
+    def close(self):
+        """Fecha os streams, encerrando o serve() do outro lado"""
+        self._writer.close()
+        if self._reader is not self._writer:
+            self._reader.close()
+
+
+def sync_files(local_file, remote_file):
+    """Sincroniza dois arquivos de cofre locais"""
+    local = VaultSync(DataManager(local_file))
+    remote = VaultSync(DataManager(remote_file))
+    try:
+        return local.sync(remote)
+    finally:
+        local.close()
+        remote.close()
+
+
+def serve_socket(manager, port, secret, host="127.0.0.1"):
+    """Aguarda uma conexão em host:port e atende um sync_socket() (somente localhost por padrão)"""
+    vault = VaultSync(manager)
+    try:
+        with socket.create_server((host, port)) as server:
+            conn, _ = server.accept()
+            with conn, conn.makefile("rw", encoding="utf-8") as stream:
+                return vault.serve(stream, stream, secret)
+    finally:
+        vault.close()
+
+
+def sync_socket(manager, address, secret):
+    """Sincroniza um cofre com outro que esteja servindo em `address`"""
+    vault = VaultSync(manager)
+    try:
+        with socket.create_connection(address) as sock:
+            peer = StreamPeer.from_socket(sock, secret)
+            try:
+                return vault.sync(peer)
+            finally:
+                peer.close()
+    finally:
+        vault.close()
@@ -0,0 +1,105 @@
+import os
+import shutil
+import tempfile
+import threading
+import unittest
+from DataManager import DataManager
+from VaultRegistry import VaultRegistry
+
+
+class VaultRegistryTestCase(unittest.TestCase):
+    """Registro de cofres com carregamento sob demanda e busca federada"""
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.files = {}
+        for name in ("A", "B", "C"):
+            self.files[name] = os.path.join(self.tmp_dir, f"{name.lower()}.json")
+            manager = DataManager(self.files[name])
+            manager.add_entry(f"site-{name}", "user@example.com", "password")
+            manager.add_entry("shared", f"{name.lower()}@example.com", "password")
+        self.registry = VaultRegistry(self.files)
+
+    def tearDown(self):
+        self.registry.close()
+        shutil.rmtree(self.tmp_dir)
+
+    def _wait_results(self, futures):
+        for future in futures:
+            try:
+                future.result(timeout=5)
+            except Exception:
+                pass
+
+    def test_rejects_duplicate_name_and_file(self):
+        with self.assertRaises(ValueError):
+            self.registry.register("A", os.path.join(self.tmp_dir, "other.json"))
+        relative = os.path.relpath(self.files["A"])
+        with self.assertRaises(ValueError):
+            self.registry.register("D", relative)
+        self.assertEqual(self.registry.names(), ["A", "B", "C"])
+
+    def test_vaults_load_lazily(self):
+        self.assertEqual(self.registry.active, "A")
+        self.assertFalse(self.registry.is_loaded("B"))
+        self.registry.get("B")
+        self.assertTrue(self.registry.is_loaded("B"))
+
+    def test_switch_does_not_reload(self):
+        manager = self.registry.manager
+        self.registry.switch("B")
+        self.assertIs(self.registry.switch("A"), manager)
+
+    def test_unload_idle_keeps_active_vault(self):
+        for name in ("A", "B", "C"):
+            self.registry.get(name)
+        self.registry.switch("B")
+
+        self.assertEqual(sorted(self.registry.unload_idle(max_idle=-1)), ["A", "C"])
+        self.assertTrue(self.registry.is_loaded("B"))
+        with self.assertRaises(ValueError):
+            self.registry.unload("B")
+
+    def test_search_tags_rows_in_registration_order(self):
+        arrived = []
+        rows = self.registry.search("shared", on_result=lambda name, result: arrived.append(name))
+
+        self.assertEqual([row['vault'] for row in rows], ["A", "B", "C"])
+        self.assertEqual([row['email'] for row in rows],
+                         ["a@example.com", "b@example.com", "c@example.com"])
+        self.assertEqual(sorted(arrived), ["A", "B", "C"])
+        # As linhas são cópias: marcar a origem não altera os dados do cofre
+        self.assertNotIn('vault', self.registry.get("A").data[1])
+
+    def test_search_async_reports_failed_vault_as_empty(self):
+        def fail(search_term=""):
+            raise RuntimeError("broken vault")
+
+        self.registry.get("B").filter_entries = fail
+        results = {}
+        futures = self.registry.search_async("site", lambda name, rows: results.update({name: rows}))
+        self._wait_results(futures)
+
+        self.assertEqual(results["B"], [])
+        self.assertEqual([row['site'] for row in results["A"]], ["site-A"])
+
+    def test_cancelled_search_does_not_report(self):
+        registry = VaultRegistry(self.files, max_workers=1)
+        release = threading.Event()
+        manager = registry.get("A")
+        original = manager.filter_entries
+        manager.filter_entries = lambda search_term="": release.wait(5) and original(search_term)
+
+        reported = []
+        futures = registry.search_async("", lambda name, rows: reported.append(name))
+        cancelled = [future for future, name in futures.items() if name != "A" and future.cancel()]
+        release.set()
+        self._wait_results(futures)
+        registry.close()
+
+        self.assertEqual(len(cancelled), 2)
+        self.assertEqual(reported, ["A"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,220 @@
+import os
+import json
+import shutil
+import tempfile
+import threading
+import unittest
+from DataManager import DataManager
+from VaultSync import VaultSync, StreamPeer, sync_files, sign_challenge
+
+SECRET = "test-secret"
+
+
+class VaultFilesTestCase(unittest.TestCase):
+    """Duas réplicas idênticas de um cofre em arquivos temporários"""
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.file_a = os.path.join(self.tmp_dir, "a.json")
+        self.file_b = os.path.join(self.tmp_dir, "b.json")
+
+        manager = DataManager(self.file_a)
+        for i in range(50):
+            manager.add_entry(f"site{i}", f"user{i}@example.com", f"password{i}")
+        shutil.copy(self.file_a, self.file_b)
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+
+    def _edit(self, data_file, entry_id, modified_date, **kwargs):
+        """Edita uma entrada fixando modified_date"""
+        manager = DataManager(data_file)
+        manager.update_entry(entry_id, **kwargs)
+        manager.find_by_id(entry_id)['modified_date'] = modified_date
+        manager._save_data()
+
+    def _assert_in_sync(self):
+        a, b = VaultSync(DataManager(self.file_a)), VaultSync(DataManager(self.file_b))
+        self.assertEqual(a.diff(b), set())
+
+
+class VaultSyncTestCase(VaultFilesTestCase):
+    """Sincronização entre dois arquivos locais"""
+
+    def test_clean_sync_reports_nothing(self):
+        report = sync_files(self.file_a, self.file_b)
+        self.assertEqual(report, {'pulled': 0, 'pushed': 0, 'conflicts': []})
+
+    def test_pull_and_push(self):
+        self._edit(self.file_a, 1, "01/01/2030 10:00:00", notes="from a")
+        self._edit(self.file_b, 2, "01/01/2030 10:00:00", notes="from b")
+        DataManager(self.file_b).add_entry("only-b", "b@example.com", "secret")
+
+        report = sync_files(self.file_a, self.file_b)
+
+        self.assertEqual((report['pulled'], report['pushed'], report['conflicts']), (2, 1, []))
+        merged = DataManager(self.file_a)
+        self.assertEqual(merged.find_by_id(1)['notes'], "from a")
+        self.assertEqual(merged.find_by_id(2)['notes'], "from b")
+        self.assertIsNotNone(merged.find_by_key("only-b", "B@example.com"))
+        self._assert_in_sync()
+
+    def test_same_timestamp_conflict_is_resolved_once(self):
+        self._edit(self.file_a, 4, "01/01/2030 10:00:00", notes="from a")
+        self._edit(self.file_b, 4, "01/01/2030 10:00:00", notes="from b")
+
+        report = sync_files(self.file_a, self.file_b)
+
+        self.assertEqual(len(report['conflicts']), 1)
+        self.assertTrue(report['conflicts'][0]['resolved'])
+        self._assert_in_sync()
+        self.assertEqual(sync_files(self.file_a, self.file_b)['conflicts'], [])
+
+    def test_concurrent_edits_are_reported(self):
+        self._edit(self.file_a, 5, "01/01/2030 10:00:00", password="changed on a")
+        self._edit(self.file_b, 5, "01/01/2030 10:00:05", notes="changed on b")
+
+        report = sync_files(self.file_a, self.file_b)
+
+        self.assertEqual(len(report['conflicts']), 1)
+        conflict = report['conflicts'][0]
+        self.assertEqual(conflict['local']['password'], "changed on a")
+        self.assertEqual(conflict['remote']['notes'], "changed on b")
+        self.assertEqual(DataManager(self.file_a).find_by_id(5)['notes'], "changed on b")
+        self._assert_in_sync()
+
+        # Depois de sincronizada, uma nova edição de um lado só não é conflito
+        self._edit(self.file_a, 5, "01/01/2030 11:00:00", notes="later on a")
+        self.assertEqual(sync_files(self.file_a, self.file_b)['conflicts'], [])
+
+    def test_rename_does_not_resurrect_old_entry(self):
+        self._edit(self.file_a, 1, "01/01/2030 10:00:00", site="renamed")
+
+        sync_files(self.file_a, self.file_b)
+
+        for data_file in (self.file_a, self.file_b):
+            manager = DataManager(data_file)
+            self.assertEqual(len(manager.data), 50)
+            self.assertIsNone(manager.find_by_key("site0", "user0@example.com"))
+
+    def test_entries_created_on_both_sides_converge(self):
+        DataManager(self.file_a).add_entry("new", "n@example.com", "from a")
+        DataManager(self.file_b).add_entry("new", "n@example.com", "from b")
+
+        sync_files(self.file_a, self.file_b)
+
+        self._assert_in_sync()
+        self.assertEqual(len(DataManager(self.file_a).data), 51)
+
+    def test_legacy_copies_get_the_same_uuids(self):
+        legacy = '[{"id": 1, "site": "old", "email": "o@example.com", "password": "cHc=", "data": "01/01/2020"}]'
+        for data_file in (self.file_a, self.file_b):
+            with open(data_file, "w", encoding="utf-8") as f:
+                f.write(legacy)
+
+        self.assertEqual(DataManager(self.file_a).data[0]['uuid'], DataManager(self.file_b).data[0]['uuid'])
+        self._assert_in_sync()
+
+    def test_merge_rejects_invalid_entries(self):
+        vault = VaultSync(DataManager(self.file_a))
+        with self.assertRaises(ValueError):
+            vault.merge([{'uuid': "x", 'site': "", 'email': "e@example.com", 'password': "p",
+                          'modified_date': "01/01/2030 10:00:00"}])
+        self.assertEqual(len(vault.manager.data), 50)
+
+    def test_close_removes_observer(self):
+        manager = DataManager(self.file_a)
+        VaultSync(manager).close()
+        self.assertEqual(manager._observers, [])
+
+
+class StreamPeerTestCase(VaultFilesTestCase):
+    """Mesma sincronização, com o outro cofre atendendo por um pipe"""
+
+    def _connect(self, server_secret, client_secret):
+        """Liga um StreamPeer a um serve() rodando em outra thread via os.pipe"""
+        to_server_r, to_server_w = os.pipe()
+        to_client_r, to_client_w = os.pipe()
+        server = VaultSync(DataManager(self.file_b))
+        self.served = []
+
+        def run():
+            with os.fdopen(to_server_r) as reader, os.fdopen(to_client_w, "w") as writer:
+                self.served.append(server.serve(reader, writer, server_secret))
+            server.close()
+
+        self.server_thread = threading.Thread(target=run)
+        self.server_thread.start()
+        reader, writer = os.fdopen(to_client_r), os.fdopen(to_server_w, "w")
+        try:
+            return StreamPeer(reader, writer, client_secret)
+        except Exception:
+            writer.close()
+            reader.close()
+            self.server_thread.join()
+            raise
+
+    def test_pipe_sync(self):
+        self._edit(self.file_a, 1, "01/01/2030 10:00:00", notes="from a")
+        self._edit(self.file_b, 2, "01/01/2030 10:00:00", notes="from b")
+        self._edit(self.file_a, 3, "01/01/2030 10:00:00", notes="tie a")
+        self._edit(self.file_b, 3, "01/01/2030 10:00:00", notes="tie b")
+
+        peer = self._connect(SECRET, SECRET)
+        local = VaultSync(DataManager(self.file_a))
+        report = local.sync(peer)
+        self.assertEqual(local.diff(peer), set())
+        peer.close()
+        self.server_thread.join()
+
+        self.assertEqual((report['pulled'] + report['pushed'], len(report['conflicts'])), (3, 1))
+        self.assertEqual(self.served, [True])
+        self._assert_in_sync()
+
+    def test_wrong_secret_is_rejected(self):
+        with self.assertRaises(Exception):
+            self._connect(SECRET, "wrong")
+        self.assertEqual(self.served, [False])
+
+    def test_malformed_auth_is_rejected(self):
+        for message in ('{"op": "auth", "args": 5}', '{"op": "auth", "args": null}',
+                        '{"op": "auth", "args": [1, 2]}', '{"op": "auth", "args": ["\u00e9", "x"]}',
+                        '[1]', 'not json'):
+            to_server_r, to_server_w = os.pipe()
+            to_client_r, to_client_w = os.pipe()
+            with os.fdopen(to_server_w, "w") as client:
+                client.write(message + "\n")
+            server = VaultSync(DataManager(self.file_b))
+            with os.fdopen(to_server_r) as reader, os.fdopen(to_client_w, "w") as writer:
+                self.assertFalse(server.serve(reader, writer, SECRET), message)
+            server.close()
+            os.close(to_client_r)
+
+    def test_server_with_wrong_secret_is_rejected(self):
+        to_server_r, to_server_w = os.pipe()
+        to_client_r, to_client_w = os.pipe()
+        received = []
+
+        def rogue_server():
+            # Aceita qualquer cliente e responde ao desafio sem conhecer o segredo
+            with os.fdopen(to_server_r) as reader, os.fdopen(to_client_w, "w") as writer:
+                writer.write(json.dumps({'challenge': "abc"}) + "\n")
+                writer.flush()
+                auth = json.loads(reader.readline())
+                writer.write(json.dumps({'result': sign_challenge("wrong", "server", auth['args'][1])}) + "\n")
+                writer.flush()
+                received.extend(line for line in reader)
+
+        thread = threading.Thread(target=rogue_server)
+        thread.start()
+        reader, writer = os.fdopen(to_client_r), os.fdopen(to_server_w, "w")
+        with self.assertRaises(PermissionError):
+            StreamPeer(reader, writer, SECRET)
+        writer.close()
+        reader.close()
+        thread.join()
+        self.assertEqual(received, [])
+
+
+if __name__ == "__main__":
+    unittest.main()